@@ -1,8 +1,31 @@
-import copy
 import itertools
 import random
 
 
+def build_neighbors(height, width):
+    """
+    Returns a dictionary mapping every cell of a height x width board to
+    the set of its in-bounds neighbors, so callers do not have to redo
+    the bounds checks on every call.
+    """
+    neighbors = {}
+    for cell in itertools.product(range(height), range(width)):
+        cell_neighbors = set()
+        for i in range(cell[0] - 1, cell[0] + 2):
+            for j in range(cell[1] - 1, cell[1] + 2):
+
+                # Ignore the cell itself
+                if (i, j) == cell:
+                    continue
+
+                # Keep the neighbor if it is in bounds
+                if 0 <= i < height and 0 <= j < width:
+                    cell_neighbors.add((i, j))
+        neighbors[cell] = cell_neighbors
+
+    return neighbors
+
+
 class Minesweeper():
     """
     Minesweeper game representation
@@ -15,21 +38,18 @@ class Minesweeper():
         self.width = width
         self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Precompute the in-bounds neighbors of every cell
+        self.neighbors = build_neighbors(height, width)
 
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Initialize an empty field with no mines, stored as one flat
+        # bytearray where cell (i, j) lives at index i * width + j
+        self.board = bytearray(height * width)
+
+        # Add mines randomly, drawing all positions at once without rejection
+        cells = list(itertools.product(range(height), range(width)))
+        self.mines = set(random.sample(cells, mines))
+        for i, j in self.mines:
+            self.board[i * width + j] = True
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -42,7 +62,7 @@ class Minesweeper():
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.board[i * self.width + j]:
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -51,7 +71,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i * self.width + j])
 
     def nearby_mines(self, cell):
         """
@@ -63,18 +83,10 @@ class Minesweeper():
         # Keep count of nearby mines
         count = 0
 
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        # Loop over the precomputed in-bounds neighbors
+        for i, j in self.neighbors[cell]:
+            if self.board[i * self.width + j]:
+                count += 1
 
         return count
 
@@ -99,6 +111,11 @@ class Sentence():
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        # recomputed on demand because the cells can shrink over time:
+        # only hold a Sentence in a set while it is not being mutated
+        return hash((frozenset(self.cells), self.count))
+
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
@@ -155,6 +172,16 @@ class MinesweeperAI():
         self.height = height
         self.width = width
 
+        # Precompute the in-bounds neighbors of every cell
+        self.neighbors = build_neighbors(height, width)
+
+        # Give every cell its own bit so a set of cells can be encoded
+        # as one int and compared with bitwise operations
+        self.cell_bits = {
+            (i, j): 1 << (i * width + j)
+            for i, j in itertools.product(range(height), range(width))
+        }
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -162,9 +189,22 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
+        # Safe cells that have not been played yet, kept up to date by
+        # mark_safe and add_knowledge so make_safe_move never rescans
+        self.safe_moves = set()
+
         # List of sentences about the game known to be true
         self.knowledge = []
 
+    def cells_mask(self, cells):
+        """
+        Returns the bitmask encoding of a set of cells.
+        """
+        mask = 0
+        for cell in cells:
+            mask |= self.cell_bits[cell]
+        return mask
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
@@ -180,6 +220,8 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.add(cell)
         for sentence in self.knowledge:
             sentence.mark_safe(cell)
 
@@ -200,6 +242,7 @@ class MinesweeperAI():
         """
         # 1 mark the cell as a move that has been made
         self.moves_made.add(cell)
+        self.safe_moves.discard(cell)
 
         # 2 mark the cell as safe
         self.mark_safe(cell)
@@ -209,21 +252,15 @@ class MinesweeperAI():
         #   get the nearby cells and remove cells that are known safes or mines
         nearby_cells = set()
 
-        #   Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
+        #   Loop over the precomputed in-bounds neighbors of the cell
+        for neighbor in self.neighbors[cell]:
 
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update nearby_cells if cell in bounds and not an already done move or a known mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                        nearby_cells.add((i, j))
-                    elif (i, j) in self.mines:
-                        # if the cell is a mine, we have to decrease the count
-                        count = count - 1
+            # Update nearby_cells if the neighbor is not an already done move or a known mine
+            if neighbor not in self.moves_made and neighbor not in self.mines:
+                nearby_cells.add(neighbor)
+            elif neighbor in self.mines:
+                # if the cell is a mine, we have to decrease the count
+                count = count - 1
 
         # create a Sentence and add it to the knowledge base if not already in it
         if nearby_cells != set():
@@ -234,35 +271,67 @@ class MinesweeperAI():
         while True:
             new = False
 
+            # remember how much was known before this pass, so marking
+            # progress also keeps the fixpoint loop going
+            nb_known = len(self.safes) + len(self.mines)
+
             # 4 mark any additional cells as safe or as mines if it can be concluded based on the AI's knowledge base
             for sentence in self.knowledge:
-                known_safes_cells = copy.deepcopy(sentence.known_safes())
+                # shallow copies are enough here: the cells are immutable
+                # tuples, we only need to guard against mark_safe/mark_mine
+                # mutating the set while we iterate over it
+                known_safes_cells = sentence.known_safes().copy()
                 for cell in known_safes_cells:
                     self.mark_safe(cell)
-                known_mines_cells = copy.deepcopy(sentence.known_mines())
+                known_mines_cells = sentence.known_mines().copy()
                 for cell in known_mines_cells:
                     self.mark_mine(cell)
 
+            # marking cells shrinks the remaining sentences, which can make
+            # more of them conclusive on the next pass
+            if len(self.safes) + len(self.mines) != nb_known:
+                new = True
+
             # remove empty sentences
             self.knowledge[:] = (x for x in self.knowledge if len(x.cells) != 0)
 
-            # copy of the knowledge base
-            knowledge_copy = list(self.knowledge)
+            # copy of the knowledge base, sorted by cell-set size so that
+            # a sentence can only be a subset of sentences that come after it
+            knowledge_copy = sorted(self.knowledge, key=lambda sentence: len(sentence.cells))
+
+            # encode each sentence's cells as one int, so the subset test
+            # below is a single AND/compare instead of a hashed set walk
+            masks = [self.cells_mask(sentence.cells) for sentence in knowledge_copy]
+
+            # snapshot the known sentences in a set for O(1) duplicate
+            # checks; no sentence is mutated while this set is alive
+            known = set(self.knowledge)
 
             # 5 add any new sentences to the AI's knowledge base if they can be inferred from existing knowledge
             # use the subset method
-            for sentence1 in knowledge_copy:
-                for sentence2 in knowledge_copy:
-                    if sentence1 is sentence2:
+            for index, sentence1 in enumerate(knowledge_copy):
+                mask1 = masks[index]
+                for index2 in range(index + 1, len(knowledge_copy)):
+                    sentence2 = knowledge_copy[index2]
+                    # two sets of the same size can only be subsets if they
+                    # are equal, which would just infer an empty sentence
+                    if len(sentence1.cells) == len(sentence2.cells):
                         continue
-                    if sentence1.cells.issubset(sentence2.cells):
+                    if mask1 & ~masks[index2] == 0:
                         new_sentence = Sentence(
                             sentence2.cells - sentence1.cells,
                             sentence2.count - sentence1.count)
-                        self.knowledge.append(new_sentence)
-                        new = True
-
-            return new
+                        # only keep the inference if it is not already known,
+                        # otherwise the knowledge base grows with duplicates
+                        # that all get re-examined on the next pass
+                        if new_sentence not in known:
+                            self.knowledge.append(new_sentence)
+                            known.add(new_sentence)
+                            new = True
+
+            # keep iterating until a full pass learns nothing new
+            if not new:
+                break
 
     def make_safe_move(self):
         """
@@ -273,9 +342,10 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for cell in self.safes:
-            if cell not in self.moves_made:
-                return cell
+        # the set of safe-but-unplayed cells is maintained incrementally,
+        # so any of its elements will do
+        if self.safe_moves:
+            return next(iter(self.safe_moves))
 
         return None
 
@@ -287,14 +357,15 @@ class MinesweeperAI():
             2) are not known to be mines
         """
 
+        # collect the cells that have not already been chosen and are not mines
+        choices = [
+            cell for cell in itertools.product(range(self.height), range(self.width))
+            if cell not in self.moves_made and cell not in self.mines
+        ]
+
         # return None if there is no more possible move to do ie if the moves_made and the mines cover all the board
-        if (len(self.moves_made) + len(self.mines)) == self.height * self.width:
+        if not choices:
             return None
 
-        # if there still exists a possible move
-        # we choose randomly among cells that have not already been chosen and that are not mines
-        while True:
-            i = random.randrange(self.height)
-            j = random.randrange(self.width)
-            if (i, j) not in self.moves_made and (i, j) not in self.mines:
-                return (i, j)
+        # we choose uniformly among the valid cells, with no retry loop
+        return random.choice(choices)
@@ -2,13 +2,98 @@
 Tic Tac Toe Player
 """
 
-import copy
 import math
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# bitmask representation: cell (i, j) is bit 3 * i + j of a 9-bit int,
+# one int per player
+
+# the 8 winning alignments (3 rows, 3 columns, 2 diagonals) as bitmasks
+WINS = (0b111000000, 0b000111000, 0b000000111,
+        0b100100100, 0b010010010, 0b001001001,
+        0b100010001, 0b001010100)
+
+# mask of a completely filled board
+FULL = 0b111111111
+
+
+def build_symmetry_tables():
+    """
+    Returns, for each of the 8 symmetries of the board (4 rotations and
+    4 reflections), a lookup table mapping any 9-bit mask to the mask of
+    the transformed board.
+    """
+    symmetries = (
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),      # rotation by 90 degrees
+        lambda i, j: (2 - i, 2 - j),  # rotation by 180 degrees
+        lambda i, j: (2 - j, i),      # rotation by 270 degrees
+        lambda i, j: (i, 2 - j),      # horizontal mirror
+        lambda i, j: (2 - i, j),      # vertical mirror
+        lambda i, j: (j, i),          # main diagonal mirror
+        lambda i, j: (2 - j, 2 - i),  # anti-diagonal mirror
+    )
+
+    tables = []
+    for symmetry in symmetries:
+        table = [0] * 512
+        for mask in range(512):
+            moved = 0
+            for k in range(9):
+                if mask & (1 << k):
+                    i, j = symmetry(*divmod(k, 3))
+                    moved |= 1 << (3 * i + j)
+            table[mask] = moved
+        tables.append(tuple(table))
+
+    return tuple(tables)
+
+
+SYMMETRY_TABLES = build_symmetry_tables()
+
+
+def canonical_bits(x_bits, o_bits):
+    """
+    Returns the smallest (x_bits, o_bits) pair over the 8 symmetries of
+    the board, so that equivalent positions share one cache entry.
+    """
+    return min((table[x_bits], table[o_bits]) for table in SYMMETRY_TABLES)
+
+
+# caches of exactly-evaluated positions, keyed by canonical (x_bits, o_bits)
+min_value_cache = {}
+max_value_cache = {}
+
+
+def board_to_bits(board):
+    """
+    Returns the board encoded as a pair (x_bits, o_bits) of 9-bit ints.
+    """
+    x_bits = 0
+    o_bits = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x_bits |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o_bits |= 1 << (3 * i + j)
+    return x_bits, o_bits
+
+
+def winner_bits(x_bits, o_bits):
+    """
+    Returns the winner of a bit-encoded board, if there is one.
+    """
+    for win in WINS:
+        if x_bits & win == win:
+            return X
+        if o_bits & win == win:
+            return O
+    return None
+
 
 def initial_state():
     """
@@ -24,20 +109,10 @@ def player(board):
     Returns player who has the next turn on a board.
     """
 
-    # Initialize count of X and O
-    count_x = 0
-    count_o = 0
+    x_bits, o_bits = board_to_bits(board)
 
-    # Loops on the board to count X and O
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == X:
-                count_x += 1
-            elif board[i][j] == O:
-                count_o += 1
-
-    # Returns player who has the next turn on a board
-    if count_x == count_o:
+    # X moves first, so X is to play whenever an even number of cells is filled
+    if bin(x_bits | o_bits).count("1") % 2 == 0:
         return X
     else:
         return O
@@ -45,20 +120,17 @@ def player(board):
 
 def actions(board):
     """
-    Returns set of all possible actions (i, j) available on the board.
+    Returns the list of all possible actions (i, j) available on the board.
     """
 
-    # Initialize the set of possible actions
-    possible_actions = set()
+    x_bits, o_bits = board_to_bits(board)
+    occupied = x_bits | o_bits
 
-    # Loops on the board to check the EMPTY case
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == EMPTY:
-                possible_actions.add((i, j))
-
-    # Returns all possible actions available on the board
-    return possible_actions
+    # Returns all possible actions available on the board,
+    # ie every cell whose bit is not set in either mask; a list is
+    # cheaper to build than a set for the at most 9 entries callers
+    # iterate or test membership on
+    return [divmod(k, 3) for k in range(9) if not occupied & (1 << k)]
 
 
 def result(board, action):
@@ -71,7 +143,8 @@ def result(board, action):
         raise Exception("This action is not valid")
 
     # makes a copy of the board before doing the action
-    new_board = copy.deepcopy(board)
+    # (the rows only hold immutable values, so copying each row is enough)
+    new_board = [row[:] for row in board]
 
     # changes the board
     new_board[action[0]][action[1]] = player(board)
@@ -85,29 +158,8 @@ def winner(board):
     Returns the winner of the game, if there is one.
     """
 
-    # defines the players list
-    players = [X, O]
-
-    # checks the rows
-    for row in range(3):
-        for player_sign in players:
-            if board[row][0] == board[row][1] == board[row][2] == player_sign:
-                return player_sign
-
-    # checks the columns
-    for col in range(3):
-        for player_sign in players:
-            if board[0][col] == board[1][col] == board[2][col] == player_sign:
-                return player_sign
-
-    # checks the diagonals
-    for player_sign in players:
-        if board[0][0] == board[1][1] == board[2][2] == player_sign:
-            return player_sign
-        if board[0][2] == board[1][1] == board[2][0] == player_sign:
-            return player_sign
-
-    return None
+    # checks the 8 winning masks against each player's bits
+    return winner_bits(*board_to_bits(board))
 
 
 def terminal(board):
@@ -115,25 +167,26 @@ def terminal(board):
     Returns True if game is over, False otherwise.
     """
 
-    # if someone has won (winner function returns X or O)
-    if winner(board) in (X, O):
-        return True
+    x_bits, o_bits = board_to_bits(board)
 
-    # or all the cells have been filled(actions set is empty)
-    elif actions(board) == set():
+    # the game is over if someone has won
+    if winner_bits(x_bits, o_bits) is not None:
         return True
 
-    else:
-        return False
+    # or all the cells have been filled
+    return (x_bits | o_bits) == FULL
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
+    # computes the winner once instead of once per comparison
+    win = winner(board)
+
+    if win == X:
         return 1
-    elif winner(board) == O:
+    elif win == O:
         return -1
     else:
         return 0
@@ -147,16 +200,24 @@ def minimax(board):
 
     if terminal(board):
         return None
-    elif player(board) == X:
+
+    # the whole search runs on the bit encoding: applying a move is a
+    # single OR, so no board copy is ever made during the recursion
+    x_bits, o_bits = board_to_bits(board)
+    occupied = x_bits | o_bits
+
+    if player(board) == X:
         best_value = -math.inf
 
         # for each possible action, we calculate the value of min_value and we keep the action with the highest value
-        for action in actions(board):
-            action_value = min_value(result(board, action))
+        for k in range(9):
+            if occupied & (1 << k):
+                continue
+            action_value = min_value(x_bits | (1 << k), o_bits, best_value, math.inf)
 
             if action_value > best_value:
                 best_value = action_value
-                best_action = action
+                best_action = divmod(k, 3)
 
                 # if the value is 1, we have found a winning action and we don't have to go further
                 if best_value == 1:
@@ -165,12 +226,14 @@ def minimax(board):
         best_value = math.inf
 
         # for each possible action, we calculate the value of max_value and we keep the action with the lowest value
-        for action in actions(board):
-            action_value = max_value(result(board, action))
+        for k in range(9):
+            if occupied & (1 << k):
+                continue
+            action_value = max_value(x_bits, o_bits | (1 << k), -math.inf, best_value)
 
             if action_value < best_value:
                 best_value = action_value
-                best_action = action
+                best_action = divmod(k, 3)
 
                 # if the value is -1, we have found a winning action and we don't have to go further
                 if best_value == -1:
@@ -179,33 +242,79 @@ def minimax(board):
     return best_action
 
 
-def min_value(board):
+def min_value(x_bits, o_bits, alpha, beta):
     """
-    Returns the lowest value
+    Returns the lowest value reachable within the (alpha, beta) window
     """
 
+    win = winner_bits(x_bits, o_bits)
+    if win is not None:
+        return 1 if win == X else -1
+
+    occupied = x_bits | o_bits
+    if occupied == FULL:
+        return 0
+
+    # equivalent positions up to symmetry share one cache entry
+    key = canonical_bits(x_bits, o_bits)
+    if key in min_value_cache:
+        return min_value_cache[key]
+
     v = math.inf
+    original_beta = beta
 
-    if terminal(board):
-        return utility(board)
+    for k in range(9):
+        if not occupied & (1 << k):
+            v = min(v, max_value(x_bits, o_bits | (1 << k), alpha, beta))
 
-    for action in actions(board):
-        v = min(v, max_value(result(board, action)))
+            # the maximizer above already has a move worth alpha,
+            # so this branch cannot influence the result anymore
+            if v <= alpha:
+                return v
+            beta = min(beta, v)
+
+    # only exact values are safe to reuse under any window; a value
+    # outside the original window is just a bound produced by a cutoff
+    if alpha < v < original_beta:
+        min_value_cache[key] = v
 
     return v
 
 
-def max_value(board):
+def max_value(x_bits, o_bits, alpha, beta):
     """
-    Returns the highest value
+    Returns the highest value reachable within the (alpha, beta) window
     """
 
-    v = -math.inf
+    win = winner_bits(x_bits, o_bits)
+    if win is not None:
+        return 1 if win == X else -1
 
-    if terminal(board):
-        return utility(board)
+    occupied = x_bits | o_bits
+    if occupied == FULL:
+        return 0
+
+    # equivalent positions up to symmetry share one cache entry
+    key = canonical_bits(x_bits, o_bits)
+    if key in max_value_cache:
+        return max_value_cache[key]
 
-    for action in actions(board):
-        v = max(v, min_value(result(board, action)))
+    v = -math.inf
+    original_alpha = alpha
+
+    for k in range(9):
+        if not occupied & (1 << k):
+            v = max(v, min_value(x_bits | (1 << k), o_bits, alpha, beta))
+
+            # the minimizer above already has a move worth beta,
+            # so this branch cannot influence the result anymore
+            if v >= beta:
+                return v
+            alpha = max(alpha, v)
+
+    # only exact values are safe to reuse under any window; a value
+    # outside the original window is just a bound produced by a cutoff
+    if original_alpha < v < beta:
+        max_value_cache[key] = v
 
     return v
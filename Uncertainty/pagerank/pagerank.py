@@ -4,9 +4,15 @@ import random
 import re
 import sys
 
+import numpy as np
+
 DAMPING = 0.85
 SAMPLES = 10000
 
+# matches the target of the href attribute of every anchor tag,
+# compiled once instead of once per crawled file
+HREF_RE = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
 
 def main():
     if len(sys.argv) != 2:
@@ -36,7 +42,7 @@ def crawl(directory):
             continue
         with open(os.path.join(directory, filename)) as f:
             contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
+            links = HREF_RE.findall(contents)
             pages[filename] = set(links) - {filename}
 
     # Only include links to other pages in the corpus
@@ -58,27 +64,47 @@ def transition_model(corpus, page, damping_factor):
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
     """
-    # create the dictionary
-    probability_distribution = {}
-    for key in corpus:
-        probability_distribution.update({key: 0})
-
-    # we first check if page has no outgoing links
-    if len(corpus[page]) == 0:
-        for key in corpus:
-            # chooses randomly among all pages with equal probability
-            probability_distribution.update({key: (1 / len(corpus))})
-    else:
-        # with probability damping_factor, add the probability in the dictionary
-        # the random surfer should randomly choose one of the links from page with equal probability
-        for item in corpus[page]:
-            probability_distribution.update({item: damping_factor / len(corpus[page])})
-        # with probability 1-damping_factor, update the probability in the dictionary
-        # the random surfer should randomly choose one of all the pages in the corpus with equal probability
-        for key in corpus:
-            probability_distribution.update({key: probability_distribution[key] + (1 - damping_factor) / len(corpus)})
-
-    return probability_distribution
+    nb_pages = len(corpus)
+    links = corpus[page]
+
+    # if page has no outgoing links, the random surfer
+    # chooses among all pages with equal probability
+    if len(links) == 0:
+        return {key: 1 / nb_pages for key in corpus}
+
+    # with probability 1-damping_factor, the random surfer chooses one of
+    # all the pages in the corpus with equal probability; with probability
+    # damping_factor, one of the links from page with equal probability
+    random_share = (1 - damping_factor) / nb_pages
+    link_share = damping_factor / len(links)
+
+    return {
+        key: random_share + link_share if key in links else random_share
+        for key in corpus
+    }
+
+
+def build_transition_matrix(corpus, damping_factor):
+    """
+    Return a tuple `(pages, T)` where `pages` is the list of page names
+    and `T` is the dense transition probability matrix: `T[i][j]` is the
+    probability of moving from `pages[i]` to `pages[j]`.
+
+    Each row mixes the links of the page (weighted by `damping_factor`)
+    with a uniform jump over all pages. A page with no outgoing links is
+    treated as linking to every page with equal probability.
+    """
+    pages = list(corpus)
+    nb_pages = len(pages)
+
+    # the distribution only depends on the page, so one call to
+    # transition_model per page is enough to fill the whole matrix
+    T = np.empty((nb_pages, nb_pages), dtype=np.float64)
+    for i, page in enumerate(pages):
+        model = transition_model(corpus, page, damping_factor)
+        T[i] = [model[other] for other in pages]
+
+    return pages, T
 
 
 def sample_pagerank(corpus, damping_factor, n):
@@ -90,31 +116,29 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    # initiate sample
-    sample = []
+    # precompute the transition matrix and its cumulative rows once,
+    # instead of rebuilding a distribution dictionary on every sample
+    pages, T = build_transition_matrix(corpus, damping_factor)
+    cum = T.cumsum(axis=1)
 
-    # choose a random page
-    page = random.choice(list(corpus))
+    # count visits per page instead of keeping the whole sample list
+    counts = np.zeros(len(pages), dtype=np.int64)
 
-    # add the page to the sample
-    sample.append(page)
+    # choose a random page
+    page_idx = random.randrange(len(pages))
+    counts[page_idx] += 1
 
     # repeat n times
+    last = len(pages) - 1
     for i in range(n):
-        # generate the next page based on the previous page's transition model
-        weights_values = list(transition_model(corpus, page, damping_factor).values())
-        page = random.choices(list(corpus),
-                              weights=weights_values,
-                              k=1)[0]
-        sample.append(page)
-
-    # create the pagerank_values
-    pagerank_values = {}
-    for page in corpus:
-        pagerank_values.update({page: sample.count(page) / n})
+        # generate the next page by inverting the cumulative distribution
+        # of the current page's row; the clamp guards against rounding
+        # leaving the last cumulative value fractionally below 1
+        page_idx = min(np.searchsorted(cum[page_idx], random.random()), last)
+        counts[page_idx] += 1
 
     # return the pageRank values
-    return pagerank_values
+    return {page: counts[i] / n for i, page in enumerate(pages)}
 
 
 def iterate_pagerank(corpus, damping_factor):
@@ -126,34 +150,23 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    # initiate pagerank_values
-    pagerank_values = {}
-    nb_pages = len(corpus)
-    for page in corpus:
-        pagerank_values.update({page: 1 / nb_pages})
-
-    precision = 0
-
-    while precision != nb_pages:
-        precision = 0
-        pagerank_copy = pagerank_values.copy()
-        for page in corpus:
-            sum_pr = 0
-            for link in corpus:
-                # if there are links to this page
-                if page in corpus[link]:
-                    sum_pr += + pagerank_copy[link] / len(corpus[link])
-                # add some logic to deal with pages with no links
-                # A page that has no links at all should be interpreted
-                # as having one link for every page in the corpus (including itself).
-                if len(corpus[link]) == 0:
-                    sum_pr += pagerank_copy[link] / nb_pages
-            value = (1 - damping_factor) / nb_pages + damping_factor * sum_pr
-            if abs(pagerank_copy[page] - value) < 0.001:
-                precision += 1
-            pagerank_values.update({page: value})
-
-    return pagerank_copy
+    # the transition matrix already encodes the damping factor, the
+    # uniform jump and the pages-with-no-links rule, so one update step
+    # is a single vector-matrix product instead of a double Python loop
+    pages, T = build_transition_matrix(corpus, damping_factor)
+    nb_pages = len(pages)
+
+    # start with an equal rank for every page
+    pr = np.full(nb_pages, 1 / nb_pages, dtype=np.float64)
+
+    while True:
+        pr_new = pr @ T
+        if np.allclose(pr, pr_new, atol=0.001):
+            pr = pr_new
+            break
+        pr = pr_new
+
+    return {page: pr[i] for i, page in enumerate(pages)}
 
 
 if __name__ == "__main__":